@@ -1,44 +1,80 @@
-from pydantic_settings import BaseSettings
-from typing import Optional
+from dataclasses import dataclass
+from functools import cache
 import logging
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 
-# Load .env file explicitly with absolute path
+# Load .env file explicitly with absolute path (dev convenience only)
 env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(env_path)
+if env_path.exists():
+    load_dotenv(env_path)
 
 logger = logging.getLogger(__name__)
 
 
-class Settings(BaseSettings):
+def _required_env(name: str) -> str:
+    """Read a required environment variable, failing fast when missing"""
+    value = os.environ.get(name)
+    if value is None:
+        raise RuntimeError(f"Missing required environment variable: {name}")
+    return value
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     # OpenAI Configuration
-    openai_api_key: str  # Required - no default
+    openai_api_key: str
     openai_model: str = "gpt-3.5-turbo"
     openai_embedding_model: str = "text-embedding-3-small"
     openai_embedding_dimension: int = 1536
-    
+
     # Milvus Configuration (Cloud)
-    milvus_host: str
+    milvus_host: str = ""
     milvus_port: int = 443
-    milvus_username: str
-    milvus_password: str
+    milvus_username: str = ""
+    milvus_password: str = ""
     milvus_collection_name: str = "chatbot_documents"
-    
+    milvus_index_type: str = "HNSW"
+    milvus_hnsw_m: int = 16
+    milvus_hnsw_ef_construction: int = 200
+    milvus_hnsw_ef: int = 64
+    milvus_vector_quant: str = "none"  # "none" | "sq8" | "pq"
+
     # Application Configuration
     app_host: str = "0.0.0.0"
     app_port: int = 8000
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
 
 
-# Settings() loads values from environment variables and .env file
-settings = Settings()  # type: ignore
+@cache
+def get_settings() -> Settings:
+    """Build the Settings once from the environment"""
+    return Settings(
+        openai_api_key=_required_env("OPENAI_API_KEY"),
+        openai_model=os.environ.get("OPENAI_MODEL", "gpt-3.5-turbo"),
+        openai_embedding_model=os.environ.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
+        openai_embedding_dimension=int(os.environ.get("OPENAI_EMBEDDING_DIMENSION", "1536")),
+        milvus_host=_required_env("MILVUS_HOST"),
+        milvus_port=int(os.environ.get("MILVUS_PORT", "443")),
+        milvus_username=_required_env("MILVUS_USERNAME"),
+        milvus_password=_required_env("MILVUS_PASSWORD"),
+        milvus_collection_name=os.environ.get("MILVUS_COLLECTION_NAME", "chatbot_documents"),
+        milvus_index_type=os.environ.get("MILVUS_INDEX_TYPE", "HNSW"),
+        milvus_hnsw_m=int(os.environ.get("MILVUS_HNSW_M", "16")),
+        milvus_hnsw_ef_construction=int(os.environ.get("MILVUS_HNSW_EF_CONSTRUCTION", "200")),
+        milvus_hnsw_ef=int(os.environ.get("MILVUS_HNSW_EF", "64")),
+        milvus_vector_quant=os.environ.get("MILVUS_VECTOR_QUANT", "none"),
+        app_host=os.environ.get("APP_HOST", "0.0.0.0"),
+        app_port=int(os.environ.get("APP_PORT", "8000")),
+    )
+
+
+settings = get_settings()
+
 
-# Debug: Log the API key (masked for security)
-masked_key = settings.openai_api_key[:10] + "..." + settings.openai_api_key[-4:] if len(settings.openai_api_key) > 14 else "***"
-logger.info(f"Loaded OpenAI API key: {masked_key}")
-logger.info(f"Loaded Milvus host: {settings.milvus_host}") 
\ No newline at end of file
+def log_settings() -> None:
+    """Log the loaded configuration (masked); called once from startup"""
+    if logger.isEnabledFor(logging.DEBUG):
+        masked_key = settings.openai_api_key[:10] + "..." + settings.openai_api_key[-4:] if len(settings.openai_api_key) > 14 else "***"
+        logger.debug(f"Loaded OpenAI API key: {masked_key}")
+        logger.debug(f"Loaded Milvus host: {settings.milvus_host}")
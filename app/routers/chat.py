@@ -1,61 +1,105 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from app.models import ChatRequest, ChatResponse, HealthResponse
 from app.services.chat_service import chat_service
 from app.services.milvus_service import milvus_service
 from app.services.openai_service import openai_service
+import asyncio
+import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Cache the deep health-check result so probes don't hit Milvus every time
+HEALTH_CACHE_TTL_SECONDS = 5.0
+_health_cache: dict = {"ts": 0.0, "result": None}
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
+
+@router.post("/chat", responses={200: {"model": ChatResponse}})
+async def chat(request: ChatRequest) -> dict:
     """Process a chat message and return a response"""
     try:
-        result = await chat_service.process_message(
+        # process_message already returns the response shape; skip the
+        # pydantic validation round-trip on this trusted internal dict
+        return await chat_service.process_message(
             message=request.message,
             conversation_id=request.conversation_id
         )
-        
-        return ChatResponse(
-            response=result["response"],
-            conversation_id=result["conversation_id"],
-            sources=result["sources"],
-            search_metadata=result.get("search_metadata")
-        )
-        
+
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """Stream a chat response as Server-Sent Events"""
+    async def event_stream():
+        async for event in chat_service.stream_message(
+            message=request.message,
+            conversation_id=request.conversation_id
+        ):
+            if event["type"] == "token":
+                yield f"data: {json.dumps({'token': event['data']})}\n\n"
+            else:
+                yield f"event: metadata\ndata: {json.dumps(event['data'])}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.get("/health/live")
+async def liveness_check() -> dict:
+    """Liveness probe - always returns 200 once the server is serving"""
+    return {"status": "alive"}
+
+
+@router.get("/health/ready")
+async def readiness_check(request: Request) -> dict:
+    """Readiness probe - 503 until startup initialization has finished"""
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="Application still starting up")
+    return {"status": "ready"}
+
+
+def _check_milvus_connection() -> bool:
+    """Verify the Milvus connection by listing collections"""
+    try:
+        from pymilvus import utility
+        utility.list_collections(using="default")
+        return True
+    except Exception as e:
+        logger.warning(f"Milvus connection test failed: {e}")
+        return False
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check() -> HealthResponse:
     """Health check endpoint"""
+    # Serve a cached result so load-balancer probes don't hammer Milvus
+    now = time.monotonic()
+    if _health_cache["result"] is not None and now - _health_cache["ts"] < HEALTH_CACHE_TTL_SECONDS:
+        return _health_cache["result"]
+
     try:
-        # Test Milvus connection properly
-        milvus_connected = False
-        try:
-            # Try to list collections to verify connection works
-            from pymilvus import utility
-            collections = utility.list_collections(using="default")
-            milvus_connected = True
-        except Exception as e:
-            logger.warning(f"Milvus connection test failed: {e}")
-            milvus_connected = False
-        
+        # Run the Milvus round-trip off the event loop
+        milvus_connected = await asyncio.to_thread(_check_milvus_connection)
         openai_configured = openai_service.is_configured()
-        
+
         status = "healthy" if milvus_connected and openai_configured else "unhealthy"
-        
-        return HealthResponse(
+
+        result = HealthResponse(
             status=status,
             milvus_connected=milvus_connected,
             openai_configured=openai_configured
         )
-        
+        _health_cache["ts"] = now
+        _health_cache["result"] = result
+        return result
+
     except Exception as e:
         logger.error(f"Error in health check: {e}")
         return HealthResponse(
@@ -1,45 +1,163 @@
 from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+import asyncio
+import hashlib
 import logging
-import json
+import time
+import numpy as np
 from app.services.milvus_service import milvus_service
 from app.services.openai_service import openai_service
 
 logger = logging.getLogger(__name__)
 
+# Minimum similarity score for a search hit to be used as context
+SIMILARITY_THRESHOLD = 0.3
+
+# Bounded TTL cache for Milvus search results, keyed by embedding hash
+SEARCH_CACHE_SIZE = 2048
+SEARCH_CACHE_TTL_SECONDS = 300.0
+
+# Semantic response cache: reuse a full RAG response when a new query's
+# embedding is near-identical to a previously answered one
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_THRESHOLD = 0.97
+
 
 class ChatService:
     def __init__(self):
-        self.milvus_service = milvus_service
-        self.openai_service = openai_service
-    
+        self._search_cache: OrderedDict[bytes, tuple] = OrderedDict()
+        self._semantic_matrix: Optional[np.ndarray] = None
+        self._semantic_responses: List[Dict[str, Any]] = []
+
+    def _semantic_lookup(self, query_embedding) -> Optional[Dict[str, Any]]:
+        """Return a cached response whose query embedding is near-identical"""
+        if self._semantic_matrix is None:
+            return None
+        q = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return None
+        similarities = self._semantic_matrix @ (q / norm)
+        best = int(np.argmax(similarities))
+        if similarities[best] >= SEMANTIC_CACHE_THRESHOLD:
+            logger.debug("Semantic cache hit (similarity %.3f)", float(similarities[best]))
+            return dict(self._semantic_responses[best])
+        return None
+
+    def _semantic_store(self, query_embedding, result: Dict[str, Any]) -> None:
+        """Remember a completed response for semantically repeated queries"""
+        q = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(q))
+        if norm == 0:
+            return
+        row = (q / norm)[None, :]
+        if self._semantic_matrix is None:
+            self._semantic_matrix = row
+        else:
+            self._semantic_matrix = np.vstack([self._semantic_matrix, row])[-SEMANTIC_CACHE_SIZE:]
+        self._semantic_responses.append({
+            "response": result["response"],
+            "sources": result["sources"],
+            "search_metadata": result["search_metadata"]
+        })
+        del self._semantic_responses[:-SEMANTIC_CACHE_SIZE]
+
+    async def _search_similar_cached(self, query_embedding, limit: int) -> List[Dict[str, Any]]:
+        """Search Milvus, serving repeated embeddings from a TTL cache"""
+        key = hashlib.blake2b(
+            np.asarray(query_embedding, dtype=np.float32).tobytes(), digest_size=16
+        ).digest()
+        now = time.monotonic()
+        cached = self._search_cache.get(key)
+        if cached is not None and now - cached[0] < SEARCH_CACHE_TTL_SECONDS:
+            self._search_cache.move_to_end(key)
+            logger.debug("Milvus search cache hit")
+            return cached[1]
+
+        similar_docs = await milvus_service.asearch_similar(query_embedding, limit)
+        self._search_cache[key] = (now, similar_docs)
+        if len(self._search_cache) > SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return similar_docs
+
+    async def _retrieve_context(self, message: str, query_embedding) -> Dict[str, Any]:
+        """Search Milvus for the query embedding and filter the results"""
+        # Search for relevant documents in Milvus without blocking the event loop
+        similar_docs = await self._search_similar_cached(query_embedding, limit=3)
+
+        # Filter out low-quality matches with a vectorized threshold pass
+        scores = np.fromiter(
+            (doc.get("score", 0) for doc in similar_docs),
+            dtype=np.float32,
+            count=len(similar_docs)
+        )
+        mask = scores >= SIMILARITY_THRESHOLD
+        filtered_docs = [similar_docs[i] for i in np.nonzero(mask)[0]]
+        filtered_scores = scores[mask]
+        highest_score = float(filtered_scores.max()) if filtered_docs else 0
+        avg_score = float(filtered_scores.mean()) if filtered_docs else 0
+        sources = [doc["id"] for doc in filtered_docs if doc.get("id")]
+
+        # Log search results for debugging; format strings only when INFO is on
+        if logger.isEnabledFor(logging.INFO):
+            rejected_ids = [similar_docs[i].get("id") for i in np.nonzero(~mask)[0]]
+            if rejected_ids:
+                logger.info(
+                    "Filtered %d docs below threshold %.2f: %s",
+                    len(rejected_ids), SIMILARITY_THRESHOLD, rejected_ids
+                )
+            logger.info(
+                "Found %d documents, filtered to %d with score >= %s",
+                len(similar_docs), len(filtered_docs), SIMILARITY_THRESHOLD
+            )
+            if filtered_docs:
+                logger.info("Filtered search scores: %s", filtered_scores.tolist())
+
+        search_metadata = {
+            "documents_found": len(filtered_docs),
+            "total_documents_searched": len(similar_docs),
+            "highest_score": highest_score,
+            "avg_score": avg_score,
+            "search_successful": True,
+            "similarity_threshold": SIMILARITY_THRESHOLD
+        }
+
+        # If no documents found after filtering, add indicator
+        if not filtered_docs:
+            search_metadata["search_successful"] = False
+            search_metadata["reason"] = f"No documents met similarity threshold ({SIMILARITY_THRESHOLD})"
+            logger.warning(f"No relevant documents found for query: '{message[:50]}...' (threshold: {SIMILARITY_THRESHOLD})")
+
+        return {
+            "context": self._build_context(filtered_docs),
+            "sources": sources,
+            "search_metadata": search_metadata
+        }
+
+    @staticmethod
+    def _error_metadata(error: Exception) -> Dict[str, Any]:
+        """Search metadata placeholder for a failed request"""
+        return {
+            "search_successful": False,
+            "reason": f"Error: {str(error)}",
+            "documents_found": 0,
+            "total_documents_searched": 0,
+            "highest_score": 0,
+            "avg_score": 0,
+            "similarity_threshold": SIMILARITY_THRESHOLD
+        }
+
     async def process_message(self, message: str, conversation_id: Optional[str] = None) -> Dict[str, Any]:
         """Process a user message and return a response"""
         try:
-            # Get embedding for the user message
-            query_embedding = self.openai_service.get_embedding(message)
-            
-            # Search for relevant documents in Milvus
-            similar_docs = self.milvus_service.search_similar(query_embedding, limit=3)
-            
-            # Filter out low-quality matches (similarity threshold)
-            SIMILARITY_THRESHOLD = 0.3  # Adjust this value as needed
-            filtered_docs = []
-            for doc in similar_docs:
-                score = doc.get("score", 0)
-                if score >= SIMILARITY_THRESHOLD:
-                    filtered_docs.append(doc)
-                else:
-                    logger.info(f"Filtering out document {doc.get('id', 'unknown')} with low score: {score:.3f}")
-            
-            # Log search results for debugging
-            logger.info(f"Found {len(similar_docs)} documents, filtered to {len(filtered_docs)} with score >= {SIMILARITY_THRESHOLD}")
-            if filtered_docs:
-                scores = [doc.get("score", 0) for doc in filtered_docs]
-                logger.info(f"Filtered search scores: {scores}")
-            
-            # Build context from filtered documents
-            context = self._build_context(filtered_docs)
-            
+            query_embedding = await openai_service.get_embedding(message)
+
+            # Serve semantically repeated queries straight from the cache
+            cached = self._semantic_lookup(query_embedding)
+            if cached is not None:
+                cached["conversation_id"] = conversation_id
+                return cached
+
             # Create messages for OpenAI
             messages = [
                 {
@@ -47,53 +165,104 @@ class ChatService:
                     "content": message
                 }
             ]
-            
-            # Get response from OpenAI
-            response = self.openai_service.get_chat_completion(messages, context)
-            
-            # Extract sources and metadata from filtered documents
-            sources = []
-            search_metadata = {
-                "documents_found": len(filtered_docs),
-                "total_documents_searched": len(similar_docs),
-                "highest_score": max([doc.get("score", 0) for doc in filtered_docs]) if filtered_docs else 0,
-                "avg_score": sum([doc.get("score", 0) for doc in filtered_docs]) / len(filtered_docs) if filtered_docs else 0,
-                "search_successful": True,
-                "similarity_threshold": SIMILARITY_THRESHOLD
-            }
-            
-            for doc in filtered_docs:
-                doc_id = doc.get("id", "")
-                if doc_id:
-                    sources.append(doc_id)
-            
-            # If no documents found after filtering, add indicator
-            if not filtered_docs:
-                search_metadata["search_successful"] = False
-                search_metadata["reason"] = f"No documents met similarity threshold ({SIMILARITY_THRESHOLD})"
-                logger.warning(f"No relevant documents found for query: '{message[:50]}...' (threshold: {SIMILARITY_THRESHOLD})")
-            
-            return {
+
+            # Overlap retrieval with a speculative zero-context completion:
+            # if the search yields no usable context the speculative answer
+            # is already in flight, hiding the Milvus latency behind the LLM.
+            retrieval_task = asyncio.create_task(self._retrieve_context(message, query_embedding))
+            no_context_task = asyncio.create_task(openai_service.get_chat_completion(messages, ""))
+
+            retrieval = await retrieval_task
+            if retrieval["context"]:
+                no_context_task.cancel()
+                try:
+                    await no_context_task
+                except asyncio.CancelledError:
+                    pass
+                except Exception as e:
+                    logger.debug(f"Speculative completion failed after cancel: {e}")
+                response = await openai_service.get_chat_completion(messages, retrieval["context"])
+            else:
+                response = await no_context_task
+
+            result = {
                 "response": response,
                 "conversation_id": conversation_id,
-                "sources": sources,
-                "search_metadata": search_metadata
+                "sources": retrieval["sources"],
+                "search_metadata": retrieval["search_metadata"]
             }
-            
+            self._semantic_store(query_embedding, result)
+            return result
+
         except Exception as e:
             logger.error(f"Failed to process message: {e}")
             return {
                 "response": "I apologize, but I encountered an error processing your request. Please try again.",
                 "conversation_id": conversation_id,
                 "sources": [],
-                "search_metadata": {
-                    "search_successful": False,
-                    "reason": f"Error: {str(e)}",
-                    "documents_found": 0,
-                    "total_documents_searched": 0,
-                    "highest_score": 0,
-                    "avg_score": 0,
-                    "similarity_threshold": 0.3
+                "search_metadata": self._error_metadata(e)
+            }
+
+    async def stream_message(self, message: str, conversation_id: Optional[str] = None):
+        """Stream response tokens for a user message, ending with a metadata event"""
+        try:
+            query_embedding = await openai_service.get_embedding(message)
+
+            # Serve semantically repeated queries straight from the cache
+            cached = self._semantic_lookup(query_embedding)
+            if cached is not None:
+                yield {"type": "token", "data": cached["response"]}
+                yield {
+                    "type": "metadata",
+                    "data": {
+                        "conversation_id": conversation_id,
+                        "sources": cached["sources"],
+                        "search_metadata": cached["search_metadata"]
+                    }
+                }
+                return
+
+            retrieval = await self._retrieve_context(message, query_embedding)
+
+            messages = [
+                {
+                    "role": "user",
+                    "content": message
+                }
+            ]
+
+            response_parts = []
+            async for token in openai_service.stream_chat_completion(messages, retrieval["context"]):
+                response_parts.append(token)
+                yield {"type": "token", "data": token}
+
+            self._semantic_store(query_embedding, {
+                "response": "".join(response_parts),
+                "sources": retrieval["sources"],
+                "search_metadata": retrieval["search_metadata"]
+            })
+
+            yield {
+                "type": "metadata",
+                "data": {
+                    "conversation_id": conversation_id,
+                    "sources": retrieval["sources"],
+                    "search_metadata": retrieval["search_metadata"]
+                }
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to stream message: {e}")
+            yield {
+                "type": "token",
+                "data": "I apologize, but I encountered an error processing your request. Please try again."
+            }
+            yield {
+                "type": "metadata",
+                "data": {
+                    "conversation_id": conversation_id,
+                    "sources": [],
+                    "search_metadata": self._error_metadata(e)
                 }
             }
     
@@ -111,20 +280,51 @@ class ChatService:
         return "\n\n".join(context_parts)
     
     async def ingest_documents(self, documents: List[Dict[str, Any]]) -> bool:
-        """Ingest documents into Milvus with embeddings"""
+        """Ingest documents into Milvus with embeddings, skipping duplicates"""
         try:
-            # Get embeddings for all documents
+            # Deduplicate by content hash: once within the batch, then
+            # against documents stored by earlier runs, so repeated
+            # content is neither re-embedded nor re-inserted
+            seen = set()
+            deduped = []
             for doc in documents:
-                content = doc.get("content", "")
-                if content:
-                    embedding = self.openai_service.get_embedding(content)
-                    doc["embedding"] = embedding
-                    # Convert metadata to JSON string for Milvus
-                    if "metadata" in doc and doc["metadata"]:
-                        doc["metadata"] = json.dumps(doc["metadata"])
-            
-            # Insert documents into Milvus
-            self.milvus_service.insert_documents(documents)
+                content = doc.get("content")
+                if not content:
+                    continue
+                content_hash = hashlib.sha256(content.encode()).hexdigest()
+                if content_hash in seen:
+                    continue
+                seen.add(content_hash)
+                doc["content_hash"] = content_hash
+                deduped.append(doc)
+
+            existing = milvus_service.existing_content_hashes(
+                [doc["content_hash"] for doc in deduped]
+            )
+            new_docs = [doc for doc in deduped if doc["content_hash"] not in existing]
+            skipped = len(documents) - len(new_docs)
+            if skipped:
+                logger.info("Skipping %d duplicate or empty documents", skipped)
+            if not new_docs:
+                return True
+
+            # Embed the remaining contents in a single batched API call
+            texts = [doc["content"] for doc in new_docs]
+            embeddings = openai_service.get_embeddings_batch(texts)
+
+            for doc, embedding in zip(new_docs, embeddings):
+                doc["embedding"] = embedding
+                # The metadata field is a native JSON column; pymilvus
+                # serializes the dict itself, just normalize missing values
+                doc["metadata"] = doc.get("metadata") or {}
+
+            # Insert documents into Milvus with a single flush at the end,
+            # then drop now-stale cached results
+            milvus_service.insert_documents(new_docs)
+            milvus_service.finalize_ingest()
+            self._search_cache.clear()
+            self._semantic_matrix = None
+            self._semantic_responses.clear()
             return True
             
         except Exception as e:
@@ -1,18 +1,82 @@
 from pymilvus import connections, Collection, CollectionSchema, FieldSchema, DataType, utility
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
 import logging
+import numpy as np
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
 class MilvusService:
-    def __init__(self):
+    def __init__(self, batch_size: int = 10_000, max_concurrency: int = 4):
         self.collection_name = settings.milvus_collection_name
         self.dimension = settings.openai_embedding_dimension
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
         self._connected = False
-        self._connect()
-    
+        self._collection: Optional[Collection] = None
+        # Tri-state: None = not yet checked against the metaservice
+        self._collection_exists: Optional[bool] = None
+        self._index_params = self._build_index_params()
+        self._search_params = self._build_search_params()
+
+    @staticmethod
+    def _effective_index_type() -> str:
+        """Index type from settings, with quantization overriding when enabled.
+
+        Vectors stay FLOAT_VECTOR at ingest; Milvus quantizes at index
+        build, storing 1 byte/dim (sq8) or PQ codes instead of FP32.
+        """
+        quant = settings.milvus_vector_quant
+        if quant == "sq8":
+            return "IVF_SQ8"
+        if quant == "pq":
+            return "IVF_PQ"
+        return settings.milvus_index_type
+
+    @staticmethod
+    def _build_index_params() -> Dict[str, Any]:
+        """Index parameters from settings; HNSW by default for sub-linear search"""
+        index_type = MilvusService._effective_index_type()
+        if index_type == "IVF_SQ8":
+            params = {"nlist": 1024}
+        elif index_type == "IVF_PQ":
+            params = {"nlist": 1024, "m": 16, "nbits": 8}
+        elif index_type == "HNSW":
+            params = {
+                "M": settings.milvus_hnsw_m,
+                "efConstruction": settings.milvus_hnsw_ef_construction
+            }
+        elif index_type == "DISKANN":
+            # DiskANN tunes itself server-side; suited to corpora too large for RAM
+            params = {}
+        else:
+            params = {"nlist": 128}
+        return {
+            "metric_type": "IP",
+            "index_type": index_type,
+            "params": params
+        }
+
+    @staticmethod
+    def _build_search_params() -> Dict[str, Any]:
+        """Search parameters matching the configured index type"""
+        index_type = MilvusService._effective_index_type()
+        if index_type == "HNSW":
+            params = {"ef": settings.milvus_hnsw_ef}
+        elif index_type == "DISKANN":
+            params = {}
+        else:
+            params = {"nprobe": 10}
+        return {"metric_type": "IP", "params": params}
+
+    def connect(self) -> None:
+        """Establish the Milvus connection; called from application startup"""
+        if not self._connected:
+            self._connect()
+
     def _connect(self) -> None:
         """Connect to Milvus cloud instance"""
         try:
@@ -32,104 +96,213 @@ class MilvusService:
             logger.warning(f"Failed to connect to Milvus: {e}")
             logger.warning("App will start without Milvus connection. Some features may be limited.")
     
+    def _get_collection(self) -> Optional[Collection]:
+        """Return the cached collection handle, loading it exactly once"""
+        if self._collection is not None:
+            return self._collection
+
+        if not self._connected:
+            return None
+
+        # Ask the metaservice once and cache the answer; only
+        # create_collection mutates it afterwards
+        if self._collection_exists is None:
+            self._collection_exists = utility.has_collection(self.collection_name)
+        if not self._collection_exists:
+            return None
+
+        collection = Collection(self.collection_name)
+        collection.load()
+        self._collection = collection
+        logger.info(f"Loaded collection {self.collection_name} for the process lifetime")
+        return collection
+
     def create_collection(self) -> None:
         """Create the document collection if it doesn't exist"""
         if not self._connected:
             logger.warning("Cannot create collection: Milvus not connected")
             return
-            
+
         if utility.has_collection(self.collection_name):
             logger.info(f"Collection {self.collection_name} already exists")
+            self._collection_exists = True
+            self._get_collection()
             return
-        
+
         fields = [
             FieldSchema(name="id", dtype=DataType.VARCHAR, is_primary=True, max_length=100),
             FieldSchema(name="content", dtype=DataType.VARCHAR, max_length=65535),
+            FieldSchema(name="content_hash", dtype=DataType.VARCHAR, max_length=64),
             FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=self.dimension),
-            FieldSchema(name="metadata", dtype=DataType.VARCHAR, max_length=65535)
+            FieldSchema(name="metadata", dtype=DataType.JSON)
         ]
-        
+
         schema = CollectionSchema(fields=fields, description="Document embeddings for chatbot")
         collection = Collection(name=self.collection_name, schema=schema)
-        
-        # Create index for vector search
-        index_params = {
-            "metric_type": "COSINE",
-            "index_type": "IVF_FLAT",
-            "params": {"nlist": 128}
-        }
-        collection.create_index(field_name="embedding", index_params=index_params)
+
+        # Create index for vector search. Embeddings are unit-normalized at
+        # ingest, so IP (inner product) equals cosine at half the FLOPs.
+        # Existing COSINE collections need a reindex to pick this up.
+        collection.create_index(field_name="embedding", index_params=self._index_params)
+        # Scalar index so ingest-time dedupe lookups on content_hash are cheap
+        collection.create_index(field_name="content_hash", index_params={"index_type": "Trie"})
+        collection.load()
+        self._collection = collection
+        self._collection_exists = True
         logger.info(f"Created collection {self.collection_name} with index")
     
-    def insert_documents(self, documents: List[Dict[str, Any]]) -> None:
-        """Insert documents with their embeddings into Milvus"""
+    def insert_documents(self, documents: List[Dict[str, Any]], flush: bool = False) -> None:
+        """Insert documents with their embeddings into Milvus.
+
+        Flush seals segments and stalls concurrent writes, so it is off by
+        default; call finalize_ingest() once after the last batch instead.
+        """
         if not self._connected:
             logger.warning("Cannot insert documents: Milvus not connected")
             return
-            
-        if not utility.has_collection(self.collection_name):
+
+        collection = self._get_collection()
+        if collection is None:
             self.create_collection()
-        
-        collection = Collection(self.collection_name)
-        collection.load()
-        
+            collection = self._get_collection()
+            if collection is None:
+                logger.warning("Cannot insert documents: collection unavailable")
+                return
+
+        # Slice into fixed-size batches; pymilvus releases the GIL during
+        # the gRPC call, so batches can be inserted concurrently
+        batches = [
+            documents[start:start + self.batch_size]
+            for start in range(0, len(documents), self.batch_size)
+        ]
+
         try:
-            collection.insert(documents)
-            collection.flush()
-            logger.info(f"Inserted {len(documents)} documents into Milvus")
+            if len(batches) == 1:
+                collection.insert(batches[0])
+            else:
+                with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                    list(pool.map(collection.insert, batches))
+            if flush:
+                collection.flush()
+            logger.info(f"Inserted {len(documents)} documents into Milvus in {len(batches)} batches")
         except Exception as e:
             logger.error(f"Failed to insert documents: {e}")
             raise
-        finally:
-            collection.release()
+
+    def existing_content_hashes(self, hashes: List[str], chunk_size: int = 1024) -> set:
+        """Return the subset of content hashes already stored in the collection.
+
+        Used by ingest to skip re-embedding documents seen in earlier
+        runs. Collections created before the content_hash field existed
+        fail the query; dedupe then degrades to in-batch only.
+        """
+        collection = self._get_collection()
+        if not hashes or collection is None:
+            return set()
+        try:
+            existing: set = set()
+            for start in range(0, len(hashes), chunk_size):
+                chunk = hashes[start:start + chunk_size]
+                expr = 'content_hash in ["' + '","'.join(chunk) + '"]'
+                rows = collection.query(expr=expr, output_fields=["content_hash"])
+                existing.update(row["content_hash"] for row in rows)
+            return existing
+        except Exception as e:
+            logger.warning(f"Could not check existing content hashes: {e}")
+            return set()
+
+    def finalize_ingest(self) -> None:
+        """Flush once after a bulk ingest so all inserts are sealed"""
+        collection = self._get_collection()
+        if collection is None:
+            return
+        try:
+            collection.flush()
+            logger.info("Flushed collection after ingest")
+        except Exception as e:
+            logger.error(f"Failed to flush collection: {e}")
+            raise
     
-    def search_similar(self, query_embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
-        """Search for similar documents based on embedding"""
+    def search_similar_batch(self, query_embeddings: List[np.ndarray], limit: int = 5,
+                             include_metadata: bool = False,
+                             expr: Optional[str] = None) -> List[List[Dict[str, Any]]]:
+        """Search for similar documents for multiple embeddings in one call.
+
+        Queries are packed into one contiguous float32 matrix so pymilvus
+        serializes each row with a single tobytes() instead of boxing
+        Python floats element by element. The RAG path only consumes
+        content, so metadata is not fetched unless include_metadata is
+        set. An optional boolean expr (e.g. metadata["category"] == "ai")
+        is pushed down to Milvus so candidates are dropped before
+        distances are computed.
+        """
         if not self._connected:
             logger.warning("Cannot search documents: Milvus not connected")
-            return []
-            
-        if not utility.has_collection(self.collection_name):
-            return []
-        
-        collection = Collection(self.collection_name)
-        collection.load()
-        
+            return [[] for _ in query_embeddings]
+
+        collection = self._get_collection()
+        if collection is None:
+            return [[] for _ in query_embeddings]
+
         try:
-            search_params = {
-                "metric_type": "COSINE",
-                "params": {"nprobe": 10}
-            }
-            
+            output_fields = ["content", "metadata"] if include_metadata else ["content"]
             results = collection.search(
-                data=[query_embedding],
+                data=np.asarray(query_embeddings, dtype=np.float32),
                 anns_field="embedding",
-                param=search_params,
+                param=self._search_params,
                 limit=limit,
-                output_fields=["content", "metadata"]
+                expr=expr,
+                output_fields=output_fields
             )
-            
-            documents = []
-            # Handle the search results properly - results is a list of SearchResult objects
+
+            # One SearchResult per input vector, in order
+            all_documents = []
             for search_result in results:  # type: ignore
+                documents = []
                 for hit in search_result:
-                    documents.append({
+                    document = {
                         "id": hit.id,
                         "content": hit.entity.get("content"),
-                        "metadata": hit.entity.get("metadata"),
                         "score": hit.score
-                    })
-            
-            return documents
+                    }
+                    if include_metadata:
+                        document["metadata"] = hit.entity.get("metadata")
+                    documents.append(document)
+                all_documents.append(documents)
+
+            return all_documents
         except Exception as e:
             logger.error(f"Failed to search documents: {e}")
-            return []
-        finally:
-            collection.release()
-    
+            return [[] for _ in query_embeddings]
+
+    def search_similar(self, query_embedding: np.ndarray, limit: int = 5,
+                       include_metadata: bool = False) -> List[Dict[str, Any]]:
+        """Search for similar documents based on a single embedding"""
+        return self.search_similar_batch([query_embedding], limit, include_metadata)[0]
+
+    async def asearch_similar(self, query_embedding: np.ndarray, limit: int = 5,
+                              include_metadata: bool = False) -> List[Dict[str, Any]]:
+        """Async wrapper running the blocking search in a worker thread"""
+        return await asyncio.to_thread(self.search_similar, query_embedding, limit, include_metadata)
+
     def is_connected(self) -> bool:
         """Check if Milvus connection is active"""
         return self._connected and connections.has_connection("default")
 
+    def close(self) -> None:
+        """Release the collection and disconnect; called from shutdown"""
+        if self._collection is not None:
+            try:
+                self._collection.release()
+            except Exception as e:
+                logger.warning(f"Failed to release collection: {e}")
+            self._collection = None
+        if self._connected:
+            try:
+                connections.disconnect("default")
+            except Exception as e:
+                logger.warning(f"Failed to disconnect from Milvus: {e}")
+            self._connected = False
+
 
 milvus_service = MilvusService() 
\ No newline at end of file
@@ -1,71 +1,234 @@
-from openai import OpenAI
-from typing import List, Dict, Any
+from openai import AsyncOpenAI, OpenAI
+from typing import AsyncIterator, List, Dict, Any, Optional
+from collections import OrderedDict
+import asyncio
+import hashlib
 import logging
+import httpx
+import numpy as np
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Bounded LRU cache for query embeddings, keyed by a hash of the normalized text
+EMBEDDING_CACHE_SIZE = 10000
+
+# Shared connection-pool settings for the OpenAI HTTP clients. HTTP/2
+# multiplexes concurrent requests over one connection instead of
+# serializing on the default HTTP/1.1 pool.
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+
+def _to_unit_vector(embedding) -> np.ndarray:
+    """Convert an embedding to a unit-norm float32 array.
+
+    Vectors are normalized once here so Milvus can use the cheaper IP
+    (inner product) metric, which equals cosine for unit vectors.
+    """
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding requests into single batched API calls"""
+
+    def __init__(self, service: "OpenAIService", max_batch: int = 64, max_wait: float = 0.008):
+        self._service = service
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def embed(self, text: str) -> np.ndarray:
+        """Queue a text for embedding and await its vector"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        """Collect requests for up to max_wait and embed them in one call"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            if len(batch) > 1:
+                logger.debug("Embedding batch of %d coalesced requests", len(batch))
+            try:
+                response = await self._service.async_client.embeddings.create(
+                    model=self._service.embedding_model,
+                    input=[text for text, _ in batch]
+                )
+                for (_, future), item in zip(batch, response.data):
+                    if not future.done():
+                        future.set_result(_to_unit_vector(item.embedding))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
 
 class OpenAIService:
     def __init__(self):
-        # Debug: Log the API key being used
-        masked_key = settings.openai_api_key[:10] + "..." + settings.openai_api_key[-4:] if len(settings.openai_api_key) > 14 else "***"
-        logger.info(f"Initializing OpenAI service with API key: {masked_key}")
-        
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        # Mask the key once; per-call logging of it was hot-path overhead
+        api_key = settings.openai_api_key
+        self._masked_key = api_key[:10] + "..." + api_key[-4:] if len(api_key) > 14 else "***"
+        logger.debug("Initializing OpenAI service with API key: %s", self._masked_key)
+
+        self._http = httpx.Client(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+        self._async_http = httpx.AsyncClient(http2=True, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+        self.client = OpenAI(api_key=settings.openai_api_key, http_client=self._http)
+        self.async_client = AsyncOpenAI(api_key=settings.openai_api_key, http_client=self._async_http)
         self.model = settings.openai_model
         self.embedding_model = settings.openai_embedding_model
-    
-    def get_embedding(self, text: str) -> List[float]:
-        """Get embedding for a text using OpenAI's embedding model"""
-        try:
-            logger.info(f"Getting embedding for text: {text[:50]}...")
-            response = self.client.embeddings.create(
-                model=self.embedding_model,
-                input=text
+        self._embedding_cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # Configuration doesn't change at runtime, so compute this once
+        self._configured = bool(api_key) and api_key != "your_openai_api_key_here"
+        self._batcher = EmbeddingBatcher(self)
+        # Canonical system message, built once so every request shares the
+        # same object and the same prompt-cache prefix bytes
+        self._static_system = {
+            "role": "system",
+            "content": "You are a helpful assistant. Use the provided context to answer the user's question."
+        }
+        self._empty_prefix = (self._static_system,)
+
+    @staticmethod
+    def _cache_key(text: str) -> bytes:
+        """Hash the normalized text into a compact cache key"""
+        return hashlib.blake2b(text.strip().lower().encode(), digest_size=16).digest()
+
+    async def get_embedding(self, text: str) -> np.ndarray:
+        """Get embedding for a text as a float32 numpy array"""
+        key = self._cache_key(text)
+        cached = self._embedding_cache.get(key)
+        if cached is not None:
+            self._embedding_cache.move_to_end(key)
+            self._cache_hits += 1
+            logger.debug(
+                "Embedding cache hit (%d hits / %d misses)",
+                self._cache_hits, self._cache_misses
             )
-            logger.info("Embedding generated successfully")
-            return response.data[0].embedding
+            return cached
+
+        self._cache_misses += 1
+        try:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Getting embedding for text: %s...", text[:50])
+            embedding = await self._batcher.embed(text)
+            logger.debug("Embedding generated successfully")
+            self._embedding_cache[key] = embedding
+            if len(self._embedding_cache) > EMBEDDING_CACHE_SIZE:
+                self._embedding_cache.popitem(last=False)
+            return embedding
         except Exception as e:
             logger.error(f"Failed to get embedding: {e}")
             raise
     
-    def get_chat_completion(self, messages: List[Dict[str, str]], context: str = "") -> str:
+    def get_embeddings_batch(self, texts: List[str], batch_size: int = 512) -> List[np.ndarray]:
+        """Get embeddings for multiple texts in batched API calls"""
+        embeddings: List[np.ndarray] = []
+        try:
+            for start in range(0, len(texts), batch_size):
+                chunk = texts[start:start + batch_size]
+                logger.info(f"Getting embeddings for batch of {len(chunk)} texts")
+                response = self.client.embeddings.create(
+                    model=self.embedding_model,
+                    input=chunk
+                )
+                embeddings.extend(
+                    _to_unit_vector(item.embedding) for item in response.data
+                )
+            logger.info(f"Generated {len(embeddings)} embeddings in {-(-len(texts) // batch_size) if texts else 0} API calls")
+            return embeddings
+        except Exception as e:
+            logger.error(f"Failed to get batch embeddings: {e}")
+            raise
+
+    def _build_messages(self, messages: List[Dict[str, str]], context: str) -> List[Dict[str, str]]:
+        """Prefix messages with a static system prompt, then the variable context.
+
+        Keeping the invariant system instruction first means OpenAI's
+        prompt caching can reuse the shared prefix across requests; the
+        retrieved RAG context varies per turn and comes after it.
+        """
+        if context:
+            prefix = (self._static_system, {"role": "system", "content": f"Context:\n{context}"})
+        else:
+            prefix = self._empty_prefix
+        return [*prefix, *messages]
+
+    async def get_chat_completion(self, messages: List[Dict[str, str]], context: str = "") -> str:
         """Get chat completion from OpenAI"""
         try:
-            logger.info(f"Getting chat completion with {len(messages)} messages")
-            # Add context to the system message if provided
-            if context:
-                system_message = {
-                    "role": "system",
-                    "content": f"You are a helpful assistant. Use the following context to answer the user's question: {context}"
-                }
-                messages = [system_message] + messages
-            
-            response = self.client.chat.completions.create(
+            logger.debug("Getting chat completion with %d messages", len(messages))
+            messages = self._build_messages(messages, context)
+
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=messages,  # type: ignore
                 max_tokens=1000,
                 temperature=0.7
             )
             
-            logger.info("Chat completion generated successfully")
+            logger.debug("Chat completion generated successfully")
             content = response.choices[0].message.content
             return content if content else "No response generated"
         except Exception as e:
             logger.error(f"Failed to get chat completion: {e}")
             raise
     
-    def is_configured(self) -> bool:
-        """Check if OpenAI is properly configured"""
+    async def stream_chat_completion(self, messages: List[Dict[str, str]], context: str = "") -> AsyncIterator[str]:
+        """Stream chat completion tokens from OpenAI as they are generated"""
         try:
-            api_key = settings.openai_api_key
-            masked_key = api_key[:10] + "..." + api_key[-4:] if len(api_key) > 14 else "***"
-            logger.info(f"Checking OpenAI configuration. API key: {masked_key}")
-            return bool(api_key) and api_key != "your_openai_api_key_here"
+            logger.debug("Streaming chat completion with %d messages", len(messages))
+            messages = self._build_messages(messages, context)
+
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,  # type: ignore
+                max_tokens=1000,
+                temperature=0.7,
+                stream=True
+            )
+
+            async for chunk in stream:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
+            logger.debug("Chat completion stream finished")
         except Exception as e:
-            logger.error(f"Error checking OpenAI configuration: {e}")
-            return False
+            logger.error(f"Failed to stream chat completion: {e}")
+            raise
+
+    def is_configured(self) -> bool:
+        """Check if OpenAI is properly configured"""
+        return self._configured
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP clients; called from shutdown"""
+        await self._async_http.aclose()
+        self._http.close()
 
 
 openai_service = OpenAIService() 
\ No newline at end of file
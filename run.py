@@ -19,7 +19,7 @@ sys.path.insert(0, str(current_dir))
 def main():
     """Start the FastAPI application"""
     print("🚀 Starting FastAPI Chatbot...")
-    
+
     # Check if .env file exists
     env_file = current_dir / ".env"
     if not env_file.exists():
@@ -28,17 +28,34 @@ def main():
         print("   cp env.example .env")
         print("   Then edit .env with your OpenAI API key and other settings.")
         print()
-    
-    # Start the server
+    else:
+        from dotenv import load_dotenv
+        load_dotenv(env_file)
+
+    # Start the server. Production gets uvloop + httptools and one worker
+    # per core; development keeps a single auto-reloading worker.
+    app_env = os.environ.get("APP_ENV", "development")
     try:
         import uvicorn
-        uvicorn.run(
-            "app.main:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            log_level="info"
-        )
+        if app_env == "production":
+            uvicorn.run(
+                "app.main:app",
+                host="0.0.0.0",
+                port=8000,
+                workers=os.cpu_count(),
+                loop="uvloop",
+                http="httptools",
+                log_level="info",
+                access_log=False
+            )
+        else:
+            uvicorn.run(
+                "app.main:app",
+                host="0.0.0.0",
+                port=8000,
+                reload=True,
+                log_level="info"
+            )
     except KeyboardInterrupt:
         print("\n👋 Server stopped by user")
     except Exception as e:
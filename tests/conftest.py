@@ -0,0 +1,46 @@
+"""Shared fixtures for the test suite.
+
+Required environment variables get placeholder defaults before app.config
+is imported, so the suite runs on machines without a .env file; a real
+.env (or real environment) still takes precedence.
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-test-placeholder")
+os.environ.setdefault("MILVUS_HOST", "localhost")
+os.environ.setdefault("MILVUS_USERNAME", "test")
+os.environ.setdefault("MILVUS_PASSWORD", "test")
+
+
+@pytest.fixture(scope="session")
+def settings():
+    """Application settings, built once per test session"""
+    from app.config import get_settings
+    return get_settings()
+
+
+@pytest.fixture(scope="session")
+def milvus_alias(settings):
+    """A live Milvus connection alias; skips the test when unreachable"""
+    from pymilvus import connections
+
+    alias = "test"
+    try:
+        connections.connect(
+            alias=alias,
+            host=settings.milvus_host,
+            port=settings.milvus_port,
+            user=settings.milvus_username,
+            password=settings.milvus_password,
+            secure=True
+        )
+    except Exception as e:
+        pytest.skip(f"Milvus not reachable: {e}")
+    yield alias
+    try:
+        connections.disconnect(alias)
+    except Exception:
+        pass
@@ -0,0 +1,26 @@
+"""Tests for environment and configuration loading"""
+
+import pytest
+
+
+def test_openai_api_key_loaded(settings):
+    assert settings.openai_api_key
+
+
+def test_required_env_raises_when_missing(monkeypatch):
+    from app.config import _required_env
+
+    monkeypatch.delenv("DOES_NOT_EXIST", raising=False)
+    with pytest.raises(RuntimeError, match="DOES_NOT_EXIST"):
+        _required_env("DOES_NOT_EXIST")
+
+
+def test_settings_are_cached(settings):
+    from app.config import get_settings
+
+    assert get_settings() is settings
+
+
+def test_settings_are_immutable(settings):
+    with pytest.raises(Exception):
+        settings.openai_api_key = "other"
@@ -0,0 +1,16 @@
+"""Integration tests against a live Milvus instance.
+
+These skip automatically when no Milvus is reachable from the test
+machine (see the milvus_alias fixture in conftest.py).
+"""
+
+from pymilvus import connections, utility
+
+
+def test_connection_is_active(milvus_alias):
+    assert connections.has_connection(milvus_alias)
+
+
+def test_list_collections(milvus_alias):
+    collections = utility.list_collections(using=milvus_alias)
+    assert isinstance(collections, list)
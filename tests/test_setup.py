@@ -0,0 +1,49 @@
+"""Tests verifying dependencies and application modules import cleanly"""
+
+import pytest
+
+
+@pytest.mark.parametrize("package", [
+    "fastapi",
+    "uvicorn",
+    "pydantic",
+    "openai",
+    "pymilvus",
+    "dotenv",
+    "numpy",
+    "orjson",
+])
+def test_dependency_importable(package):
+    pytest.importorskip(package)
+
+
+def test_configuration(settings):
+    assert settings.openai_api_key
+    assert settings.milvus_host
+    assert settings.milvus_port > 0
+    assert settings.milvus_collection_name
+    assert settings.openai_model
+    assert settings.openai_embedding_model
+    assert settings.openai_embedding_dimension > 0
+
+
+def test_models_import():
+    from app.models import ChatRequest, ChatResponse, HealthResponse  # noqa: F401
+
+
+def test_services_import():
+    from app.services.openai_service import openai_service
+    from app.services.milvus_service import milvus_service
+    from app.services.chat_service import chat_service
+
+    assert openai_service.is_configured() in (True, False)
+    assert milvus_service.collection_name
+    assert chat_service is not None
+
+
+def test_app_builds():
+    from app.main import app
+
+    paths = {route.path for route in app.routes}
+    assert "/chat" in paths
+    assert "/api/v1/chat" in paths